@@ -1,15 +1,54 @@
+from __future__ import annotations
+
 from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from typing import Any
+
+# All IR types are slotted: one ObjectIR per ADD_* statement, so no per-instance __dict__.
+# Type names are interned where they are produced (the parser uses compile-time literals),
+# so grouping by type compares by identity.
 
-@dataclass
-class Object:
+@dataclass(slots=True)
+class ObjectIR:
     id: str
     type: str
-    attrs: Dict[str, Any] = field(default_factory=dict)
+    attrs: dict[str, Any]
+    # position of the ADD_* statement; the ints come straight from the keyword token
+    line: int
+    column: int
 
-@dataclass
+    @property
+    def loc(self) -> tuple[int, int]:
+        """(line, column) of the ADD_* statement, built on access."""
+        return (self.line, self.column)
+
+@dataclass(slots=True)
+class PageIR:
+    id: str
+    attrs: dict[str, Any]
+    line: int
+    column: int
+
+    @property
+    def loc(self) -> tuple[int, int]:
+        """(line, column) of the PAGE statement, built on access."""
+        return (self.line, self.column)
+
+@dataclass(slots=True)
 class IR:
-    objects: Dict[str, Object] = field(default_factory=dict)
-    series: List[List[str]] = field(default_factory=list)  # CONNECT chains (IDs + OPEN/STUB tokens)
-    pages: List[Dict[str, Any]] = field(default_factory=list)
-    style: Dict[str, Any] = field(default_factory=dict)
+    objects: dict[str, ObjectIR] = field(default_factory=dict)
+    # CONNECT chains (IDs + OPEN_END/STUB dicts) with the (line, column) of the statement
+    series: list[tuple[list[Any], tuple[int, int]]] = field(default_factory=list)
+    pages: dict[str, PageIR] = field(default_factory=dict)
+    style: dict[str, Any] = field(default_factory=dict)
+    meta: dict[str, Any] = field(default_factory=dict)  # room for version, etc.
+    # columnar views parallel to objects (insertion order); kv_column is None when absent.
+    # These and by_type are parse-time snapshots: they go stale if objects is mutated later.
+    object_list: list[ObjectIR] = field(default_factory=list, repr=False)
+    types: list[str] = field(default_factory=list)
+    kv_column: list[float | None] = field(default_factory=list)
+    # per-type object lists (definition order within a type) for passes that work type by type
+    by_type: dict[str, list[ObjectIR]] = field(default_factory=dict, repr=False)
+
+    def iter_objects(self):
+        """Iterate objects in definition order without going through the id table."""
+        return iter(self.object_list)
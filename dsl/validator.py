@@ -1,5 +1,8 @@
 from .ir_types import IR
 
+# object types that may legitimately join different voltages in a series
+_BRIDGES = frozenset(("TRANSFORMER", "BUS"))
+
 class DSLValidationError(Exception):
     def __init__(self, code: str, msg: str):
         super().__init__(f"{code}: {msg}")
@@ -13,38 +16,41 @@ def _kv_of(ir: IR, obj_id: str) -> float | None:
     return o.attrs.get("kv")
 
 def validate(ir: IR) -> None:
-    # 1) ID uniqueness
-    if len(set(ir.objects.keys())) != len(ir.objects):
-        raise DSLValidationError("E.ID.DUP", "Duplicate object ids found.")
+    objects = ir.objects
+    objects_get = objects.get  # bound once; used per chain item below
+    # ID uniqueness needs no check here: objects is keyed by id and the parser rejects duplicates
 
-    # 2) CONNECT chains non-empty; allow OPEN_END/STUB at edges only
-    for chain in ir.series:
+    # 1) CONNECT chains non-empty; allow OPEN_END/STUB at edges only
+    for chain, loc in ir.series:
         if not chain:
-            raise DSLValidationError("E.CONNECT.EMPTY", "Empty CONNECT series.")
-        for i, itm in enumerate(chain):
-            if isinstance(itm, dict):  # OPEN_END/STUB
-                if i not in (0, len(chain)-1):
+            raise DSLValidationError("E.CONNECT.EMPTY", f"Empty CONNECT series at line {loc[0]}.")
+        n = len(chain)
+        # endpoints may be anything; only the interior (chains of 3+) has to be checked
+        if n > 2:
+            for itm in chain[1:-1]:
+                if type(itm) is dict:  # OPEN_END/STUB
                     raise DSLValidationError("E.CONNECT.ENDPOINT",
                         "OPEN_END/STUB allowed only at start or end of series.")
-        # 3) Voltage sanity: adjacent real objects should have same kv unless one is a transformer or bus bridge
-        for a, b in zip(chain, chain[1:]):
-            if isinstance(a, dict) or isinstance(b, dict):  # skip endpoints
-                continue
-            oa, ob = ir.objects.get(a), ir.objects.get(b)
-            if not oa or not ob:  # one may be a BUS id not added yet (should be added though)
+        elif n == 1:
+            continue  # a single item has no edges to check
+        # 2) Voltage sanity: adjacent real objects should have same kv unless one is a transformer or bus bridge
+        # look each item up once per chain (OPEN_END/STUB map to None), then sweep the edges
+        objs = [objects_get(itm) if type(itm) is str else None for itm in chain]
+        for a, b, oa, ob in zip(chain, chain[1:], objs, objs[1:]):
+            if not oa or not ob:  # endpoint, or a BUS id not added yet (should be added though)
                 continue
-            if {"TRANSFORMER","BUS"} & {oa.type, ob.type}:
+            if oa.type in _BRIDGES or ob.type in _BRIDGES:
                 continue  # handled by higher-level checks
             kva, kvb = oa.attrs.get("kv"), ob.attrs.get("kv")
             if kva is not None and kvb is not None and abs(kva-kvb) > 0.15*max(kva, kvb):
                 raise DSLValidationError("E.VOLT.MISMATCH",
                     f"Voltage mismatch between {a}({kva}) and {b}({kvb}).")
 
-    # 4) Breakers should appear in at least one series
-    breakers = {oid for oid, o in ir.objects.items() if o.type == "BREAKER"}
-    in_series = {oid for chain in ir.series for oid in chain if isinstance(oid, str)}
-    for brk in breakers:
-        if brk not in in_series:
-            raise DSLValidationError("E.PROT.BRK_UNUSED", f"Breaker {brk} is not connected.")
+    # 3) Breakers should appear in at least one series
+    breakers = {oid for oid, o in objects.items() if o.type == "BREAKER"}
+    in_series = {oid for chain, _ in ir.series for oid in chain if isinstance(oid, str)}
+    missing = breakers - in_series
+    if missing:
+        raise DSLValidationError("E.PROT.BRK_UNUSED", f"Breakers not connected: {sorted(missing)}")
 
     # Add other rules as you need (bus existence, coupler buses differ, etc.)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the IR validator - runs validate() on parser output
+"""
+
+import unittest
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from dsl.parser import parse, parse_file
+from dsl.validator import validate, DSLValidationError
+
+
+class TestValidator(unittest.TestCase):
+    """Test validation rules on parsed substations"""
+
+    def test_example_files_validate(self):
+        """Test that the bundled example files pass validation"""
+        examples = os.path.join(os.path.dirname(__file__), 'examples')
+
+        validate(parse_file(os.path.join(examples, 'simple_substation.dsl')))
+        validate(parse_file(os.path.join(examples, 'complex_substation.dsl')))
+
+    def test_unconnected_breakers(self):
+        """Test that every breaker missing from the series is reported"""
+        dsl = """
+ADD_BUS id=main-138, kv=138
+ADD_BREAKER id=brk-b, kv=138, interrupting_kA=40, type=SF6, continuous_A=2000
+ADD_BREAKER id=brk-a, kv=138, interrupting_kA=40, type=SF6, continuous_A=2000
+ADD_BREAKER id=brk-c, kv=138, interrupting_kA=40, type=SF6, continuous_A=2000
+CONNECT series=[main-138, brk-c]
+        """
+        with self.assertRaises(DSLValidationError) as ctx:
+            validate(parse(dsl))
+
+        self.assertEqual(ctx.exception.code, "E.PROT.BRK_UNUSED")
+        self.assertIn("['brk-a', 'brk-b']", str(ctx.exception))
+
+    def test_open_end_only_at_edges(self):
+        """Test that OPEN_END is allowed at the ends of a series but not inside it"""
+        dsl = """
+ADD_BUS id=main-138, kv=138
+ADD_LINE id=line-1, kv=138, type=OHL, length_km=10, thermal_A=1000
+CONNECT series=[OPEN_END, line-1, main-138]
+        """
+        validate(parse(dsl))
+
+        with self.assertRaises(DSLValidationError) as ctx:
+            validate(parse(dsl.replace("[OPEN_END, line-1, main-138]", "[line-1, OPEN_END, main-138]")))
+        self.assertEqual(ctx.exception.code, "E.CONNECT.ENDPOINT")
+
+    def test_voltage_mismatch(self):
+        """Test that adjacent non-bridge objects must share a voltage level"""
+        dsl = """
+ADD_BREAKER id=hv-brk, kv=138, interrupting_kA=40, type=SF6, continuous_A=2000
+ADD_LINE id=lv-line, kv=13.8, type=UGC, length_km=5, thermal_A=800
+CONNECT series=[hv-brk, lv-line]
+        """
+        with self.assertRaises(DSLValidationError) as ctx:
+            validate(parse(dsl))
+
+        self.assertEqual(ctx.exception.code, "E.VOLT.MISMATCH")
+
+    def test_bridges_join_voltage_levels(self):
+        """Test that a bus or transformer may sit between different voltage levels"""
+        dsl = """
+ADD_BUS id=hv-138, kv=138
+ADD_BREAKER id=lv-brk, kv=13.8, interrupting_kA=25, type=VACUUM, continuous_A=1200
+CONNECT series=[hv-138, lv-brk]
+        """
+        validate(parse(dsl))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
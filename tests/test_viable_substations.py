@@ -5,12 +5,15 @@ using only the supported commands: ADD_BUS, ADD_BAY, ADD_COUPLER, ADD_BREAKER,
 ADD_DISCONNECTOR, ADD_TRANSFORMER, ADD_LINE, CONNECT, APPEND_TO_BAY, VALIDATE, EMIT_SPEC
 """
 
+import copy
+import pickle
 import unittest
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from dsl.parser import parse, ParseError
+from lark import Token
+from dsl.parser import parse, parse_file, parse_interactive, ParseError, _STRINGS
 
 
 class TestViableSubstations(unittest.TestCase):
@@ -306,6 +309,145 @@ EMIT_SPEC
         kv_levels = {obj.attrs.get('kv') for obj in result.objects.values() if 'kv' in obj.attrs}
         self.assertGreaterEqual(len(kv_levels), 5)  # Multiple voltage levels
 
+    def test_columnar_views(self):
+        """Test that the type/kv columns stay parallel to the object table"""
+        dsl = """
+ADD_BUS id=hv-bus, kv=138
+ADD_TRANSFORMER id=main-tx, type=TWO_WINDING, rated_MVA=50, vector_group="Dy11", percentZ=8.5
+ADD_BUS id=lv-bus, kv=13.8
+CONNECT series=[hv-bus, main-tx, lv-bus]
+        """
+        result = parse(dsl)
+        
+        self.assertEqual(list(result.iter_objects()), list(result.objects.values()))
+        self.assertEqual(result.types, [obj.type for obj in result.iter_objects()])
+        self.assertEqual(result.kv_column, [138, None, 13.8])  # transformers carry no kv
+        self.assertEqual(pickle.loads(pickle.dumps(result)), result)
+        self.assertEqual([obj.id for obj in result.by_type['BUS']], ['hv-bus', 'lv-bus'])
+        self.assertEqual([obj.id for obj in result.by_type['TRANSFORMER']], ['main-tx'])
+
+    def test_enum_values_are_plain_strings(self):
+        """Test that enum attributes come back as str, not lark Tokens"""
+        dsl = """
+ADD_BAY id=line-bay, kind=LINE, kv=138, bus=main-138
+ADD_BREAKER id=brk, kv=138, interrupting_kA=40, type=SF6, continuous_A=2000
+ADD_LINE id=line-1, kv=138, type=OHL, length_km=50, thermal_A=1500
+        """
+        result = parse(dsl)
+        
+        self.assertIs(type(result.objects['line-bay'].attrs['kind']), str)
+        self.assertIs(type(result.objects['brk'].attrs['type']), str)
+        self.assertIs(type(result.objects['line-1'].attrs['type']), str)
+        self.assertEqual(result.objects['brk'].attrs['type'], 'SF6')
+
+    def test_extra_params(self):
+        """Test trailing key=value extras are merged into attrs (mandatory keys win)"""
+        dsl = """
+ADD_BUS id=main-bus, kv=138, kv=69, zone="north"
+ADD_BREAKER id=brk, kv=138, interrupting_kA=40, type=SF6, continuous_A=2000, trip_ms=50
+        """
+        result = parse(dsl)
+        
+        self.assertEqual(result.objects['main-bus'].attrs['kv'], 138)
+        self.assertEqual(result.objects['main-bus'].attrs['zone'], 'north')
+        self.assertEqual(result.objects['brk'].attrs['trip_ms'], 50)
+        self.assertEqual(result.objects['brk'].attrs['type'], 'SF6')
+
+    def test_series_and_list_values(self):
+        """Test CONNECT chains and list/composite extras come out as plain Python values"""
+        dsl = """
+ADD_BUS id=main-bus, kv=138, tags=[north, hv], seq={r1=0.05, x1=0.4}
+CONNECT series=[main-bus, OPEN_END, STUB("spare")]
+        """
+        result = parse(dsl)
+
+        attrs = result.objects['main-bus'].attrs
+        self.assertEqual(attrs['tags'], ['north', 'hv'])
+        self.assertEqual(attrs['seq'], {'r1': 0.05, 'x1': 0.4})
+        self.assertEqual(result.objects['main-bus'].loc, (2, 1))
+        chain, loc = result.series[0]
+        self.assertEqual(chain, ['main-bus', {'OPEN_END': True}, {'STUB': 'spare'}])
+        self.assertEqual(loc, (3, 1))
+
+    def test_object_loc_points_at_keyword(self):
+        """Test that an object's loc is the line and column of its ADD_<KIND> keyword"""
+        dsl = """
+ADD_BUS id=main-bus, kv=138
+  ADD_BREAKER id=brk, kv=138, interrupting_kA=40, type=SF6, continuous_A=2000
+        """
+        result = parse(dsl)
+
+        self.assertEqual(result.objects['main-bus'].loc, (2, 1))
+        self.assertEqual(result.objects['brk'].loc, (3, 3))
+
+    def test_duplicate_id_rejected(self):
+        """Test that reusing an object id fails at parse time"""
+        dsl = """
+ADD_BUS id=main-bus, kv=138
+ADD_BUS id=main-bus, kv=69
+        """
+        with self.assertRaisesRegex(ValueError, "Duplicate id 'main-bus' at line 3"):
+            parse(dsl)
+
+    def test_parse_cache_returns_copies(self):
+        """Test that cached parses are equal but independent"""
+        dsl = "ADD_BUS id=main-bus, kv=138\nCONNECT series=[main-bus, OPEN_END]\n"
+        first = parse(dsl, cache=True)
+        first.objects['main-bus'].attrs['kv'] = 69
+        second = parse(dsl, cache=True)
+        
+        self.assertEqual(second.objects['main-bus'].attrs['kv'], 138)
+        self.assertEqual(second.series, parse(dsl).series)
+
+    def test_string_pool_scoped_to_parse(self):
+        """Test that pooled STRING literals do not outlive a parse, even a failed one"""
+        tx = 'ADD_TRANSFORMER id=tx, type=AUTO, rated_MVA=50, vector_group="Dy11", percentZ=8.5\n'
+        parse(tx)
+        self.assertEqual(len(_STRINGS), 0)
+
+        with self.assertRaises(ParseError):
+            parse(tx + 'ADD_BUS id=bus kv=138\n')
+        self.assertEqual(len(_STRINGS), 0)
+
+        with self.assertRaisesRegex(ValueError, "Duplicate id"):
+            parse(tx + tx)
+        self.assertEqual(len(_STRINGS), 0)
+
+        ip = parse_interactive(tx + tx)
+        ip.exhaust_lexer()
+        with self.assertRaisesRegex(ValueError, "Duplicate id"):
+            ip.feed_eof()
+        self.assertEqual(len(_STRINGS), 0)
+
+    def test_parse_interactive_copy(self):
+        """Test interactive parser copies continue independently to the same IR"""
+        ip = parse_interactive("ADD_BUS id=bus-a, kv=138\nADD_BUS id=bus-b, kv=69\n")
+        ip.exhaust_lexer()
+        branch = copy.copy(ip)
+        
+        # Tokens on the value stack are shared with the copy, not deep-copied
+        tokens = [v for v in ip.parser_state.value_stack if isinstance(v, Token)]
+        branch_tokens = [v for v in branch.parser_state.value_stack if isinstance(v, Token)]
+        self.assertTrue(tokens)
+        self.assertEqual(len(tokens), len(branch_tokens))
+        for tok, branch_tok in zip(tokens, branch_tokens):
+            self.assertIs(branch_tok, tok)
+        
+        self.assertEqual(list(ip.feed_eof().objects), ['bus-a', 'bus-b'])
+        self.assertEqual(list(branch.feed_eof().objects), ['bus-a', 'bus-b'])
+
+    def test_parse_example_files(self):
+        """Test parsing the bundled example files from disk"""
+        examples = os.path.join(os.path.dirname(__file__), 'examples')
+        
+        result = parse_file(os.path.join(examples, 'simple_substation.dsl'))
+        self.assertEqual(len(result.objects), 5)
+        self.assertEqual(len(result.series), 1)
+        
+        result = parse_file(os.path.join(examples, 'complex_substation.dsl'))
+        self.assertEqual(len(result.objects), 20)
+        self.assertEqual(len(result.series), 3)
+
     def test_error_handling(self):
         """Test that invalid DSL produces appropriate errors"""
         
@@ -360,6 +502,7 @@ EMIT_SPEC
         # Verify complex connections
         self.assertEqual(len(result.objects), 14)
         self.assertEqual(len(result.series), 5)  # 5 different series connections
+        self.assertEqual(result.series[3][0], ['main-230', 'tx-hv-brk', 'step-down-tx', 'dist-69'])
 
 
 if __name__ == '__main__':